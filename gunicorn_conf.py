@@ -0,0 +1,12 @@
+# Gunicorn configuration for the Email API
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Keep a single worker process: the APScheduler jobs are started when main.py
+# is imported, so every extra worker would send the daily emails again.
+# Threads let slow requests (e.g. /trigger-test) overlap instead of queueing.
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+keepalive = 5
@@ -1,23 +1,52 @@
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from datetime import datetime, timedelta
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, From, To, HtmlContent
 from dotenv import load_dotenv
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
-import pytz
+from zoneinfo import ZoneInfo
 import traceback
 import atexit
-import json
+import orjson
+import re
+import time
+import random
+import csv
+import itertools
+import gzip
+import io
+import html as html_lib
+import tempfile
+import threading
+from types import MappingProxyType
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for faster jsonify/get_json"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app.json = ORJSONProvider(app)
+
 # ===========================
 # IMPROVED CORS CONFIGURATION
 # ===========================
@@ -32,6 +61,9 @@ ALLOWED_ORIGINS = [
     "http://127.0.0.1:5000"
 ]
 
+# Hashed copy for the per-request origin check; the list keeps its order for display
+ALLOWED_ORIGIN_SET = frozenset(ALLOWED_ORIGINS)
+
 # Configure CORS with explicit settings
 CORS(app, 
      resources={
@@ -41,46 +73,20 @@ CORS(app,
              "allow_headers": ["Content-Type", "Authorization", "X-API-Key", "Accept"],
              "expose_headers": ["Content-Type"],
              "supports_credentials": True,
+             "send_wildcard": False,
+             "automatic_options": True,
              "max_age": 3600
          }
      }
 )
 
-# Additional CORS headers for all responses
-@app.after_request
-def after_request(response):
-    """Add comprehensive CORS headers to all responses"""
+# flask-cors answers whitelisted origins; requests from anywhere else get no CORS headers
+@app.before_request
+def log_disallowed_origin():
+    """Log requests from origins outside ALLOWED_ORIGINS"""
     origin = request.headers.get('Origin')
-    
-    # Check if origin is allowed
-    if origin in ALLOWED_ORIGINS:
-        response.headers['Access-Control-Allow-Origin'] = origin
-    else:
-        # For security, still allow the request but log it
+    if origin and origin not in ALLOWED_ORIGIN_SET:
         logger.warning(f"Request from non-whitelisted origin: {origin}")
-        if origin:
-            response.headers['Access-Control-Allow-Origin'] = origin
-    
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-API-Key, Accept'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response.headers['Access-Control-Allow-Credentials'] = 'true'
-    response.headers['Access-Control-Max-Age'] = '3600'
-    
-    # Prevent caching of CORS preflight
-    if request.method == 'OPTIONS':
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-    
-    return response
-
-# Explicit OPTIONS handler for all routes
-@app.route('/', methods=['OPTIONS'])
-@app.route('/<path:path>', methods=['OPTIONS'])
-def handle_options(path=None):
-    """Handle preflight OPTIONS requests"""
-    response = jsonify({'status': 'ok'})
-    return response, 200
 
 # Configuration
 SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
@@ -89,10 +95,94 @@ ALERT_EMAIL = os.getenv('ALERT_EMAIL')
 TEMPLATE_PATH = os.getenv('TEMPLATE_PATH', 'template.html')
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'production')
 ENABLE_MONITORING = os.getenv('ENABLE_MONITORING', 'true').lower() == 'true'
+START_SCHEDULER = os.getenv('START_SCHEDULER', 'true').lower() == 'true'
 MONITORING_INTERVAL_HOURS = int(os.getenv('MONITORING_INTERVAL_HOURS', '6'))
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', '20'))
+try:
+    MAIL_SEND_RATE_PER_SECOND = float(os.getenv('MAIL_SEND_RATE_PER_SECOND', '50'))
+except ValueError:
+    # Rejected with a warning, once logging is set up, where the token bucket is built
+    MAIL_SEND_RATE_PER_SECOND = float('nan')
+VERBOSE_BANNER = os.getenv('VERBOSE_BANNER', 'false').lower() == 'true'
+
+CONTACT_EXPORT_TIMEOUT_SECONDS = int(os.getenv('CONTACT_EXPORT_TIMEOUT_SECONDS', '300'))
+
+# SendGrid accepts at most 1000 personalizations per Mail Send request
+MAX_PERSONALIZATIONS = 1000
+
+# Seconds between status polls of a contact export job
+CONTACT_EXPORT_POLL_SECONDS = 5
+
+# Per-run template tokens; {{NAME}} is left in place for SendGrid's per-recipient substitution
+TEMPLATE_TOKEN_RE = re.compile(r"\{\{(TODAY|TIMESTAMP|DATE)\}\}")
+
+# How many times a Mail Send call rejected with 429/503 is retried after backing off
+MAIL_SEND_MAX_RETRIES = 5
+
+# Verified senders rarely change, so the /v3/verified_senders list is reused for this long
+SENDER_CHECK_CACHE_SECONDS = 300
+
+# Only this many failed recipients are kept for the run's result and alert email
+MAX_REPORTED_FAILURES = 100
+
+# A health check finished this recently is reused instead of running (and alerting) again
+MONITORING_DEBOUNCE_SECONDS = 30
+
+# Longer "Additional Information" in alert emails (tracebacks) keeps only its tail
+MAX_NOTIFICATION_INFO_CHARS = 4000
+
+# Repeats of the same notification type within this window are collapsed into the first
+NOTIFICATION_DEDUPE_SECONDS = 5
+
+# Alerts waiting for delivery beyond this many drop the oldest, so a storm can't pile up
+MAX_PENDING_NOTIFICATIONS = 20
+
+# After GET /marketing/contacts fails, contact lookups go straight to search for this long
+CONTACTS_SEARCH_STICKY_SECONDS = 3600
+
+# Sends fired close together (manual trigger + scheduled run) reuse one contact export
+CONTACT_EXPORT_CACHE_SECONDS = 300
+
+# (connect, read) timeout for the small SendGrid REST lookups - fail fast when unreachable
+SENDGRID_LOOKUP_TIMEOUT = (3.05, 10)
+
+# (connect, read) timeout for Mail Send and export calls - large bodies may read slowly, but connecting should not
+SENDGRID_SEND_TIMEOUT = (3.05, 30)
+
+# Shared HTTP session for SendGrid REST calls so TLS connections are kept alive
+SENDGRID_SESSION = requests.Session()
+SENDGRID_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+))
+SENDGRID_SESSION.headers.update({
+    "Authorization": f"Bearer {SENDGRID_API_KEY}",
+    "Content-Type": "application/json"
+})
+
+# Separate keep-alive session for downloading contact export files. Export URLs
+# are pre-signed, so this one must not carry the SendGrid auth header
+EXPORT_DOWNLOAD_SESSION = requests.Session()
+EXPORT_DOWNLOAD_SESSION.mount("https://", HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+))
 
 # UAE Timezone
-UAE_TZ = pytz.timezone("Asia/Dubai")
+UAE_TZ = ZoneInfo("Asia/Dubai")
+
+@lru_cache(maxsize=1)
+def _format_uae_second(epoch_second):
+    return datetime.fromtimestamp(epoch_second, UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+
+def uae_timestamp():
+    """Current UAE time as 'YYYY-MM-DD HH:MM:SS +04' - formatted at most once per second"""
+    return _format_uae_second(int(time.time()))
 
 # Configure logging with more detail
 logging.basicConfig(
@@ -111,6 +201,9 @@ last_execution = {
     "error": None
 }
 
+# last_execution["timestamp"] as an aware datetime, so health checks needn't parse it back
+last_execution_at = None
+
 # Global variable to track monitoring status
 monitoring_status = {
     "last_check": None,
@@ -120,6 +213,12 @@ monitoring_status = {
     "checks_failed": 0
 }
 
+# Monotonic time until which contact lookups skip the GET endpoint
+contacts_search_until = 0.0
+
+# Monotonic time the last health monitoring pass finished
+last_monitoring_run = None
+
 # Global variable to store current schedule configuration
 schedule_config = {
     "hour": 10,
@@ -128,8 +227,44 @@ schedule_config = {
     "updated_by": "system"
 }
 
+# Last successful /v3/verified_senders results as (monotonic time, senders)
+verified_senders_cache = None
+
+# Download URLs of the last finished contact export as (monotonic time, urls)
+contact_export_cache = None
+contact_export_lock = threading.Lock()
+
+# Manual test sends run here, off the request thread; one worker so they never overlap
+manual_send_executor = ThreadPoolExecutor(max_workers=1)
+manual_send_future = None
+manual_send_lock = threading.Lock()
+
+# Outcome of the last /trigger-test send, replaced as a whole when it changes
+last_test_send = {
+    "timestamp": None,
+    "status": "Not started",
+    "message": "",
+    "emails_sent": 0,
+    "error": None
+}
+
+# Delivers alert emails in the background, in the order they were raised
+notification_executor = ThreadPoolExecutor(max_workers=1)
+pending_notifications = deque()
+last_notification_at = {}
+notification_lock = threading.Lock()
+
+# Runs the health checks of one monitoring pass side by side
+health_check_executor = ThreadPoolExecutor(max_workers=3)
+
 # Config file path
-CONFIG_FILE = 'schedule_config.json'
+CONFIG_FILE = os.getenv('SCHEDULE_CONFIG_FILE', 'schedule_config.json')
+
+# Serialized schedule_config as last read from / written to CONFIG_FILE
+saved_schedule_config = None
+
+# Serializes writes of CONFIG_FILE across request threads
+schedule_config_lock = threading.Lock()
 
 # ===========================
 # CONFIGURATION MANAGEMENT
@@ -137,12 +272,13 @@ CONFIG_FILE = 'schedule_config.json'
 
 def load_schedule_config():
     """Load schedule configuration from file"""
-    global schedule_config
+    global schedule_config, saved_schedule_config
     try:
         if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r') as f:
-                loaded_config = json.load(f)
+            with open(CONFIG_FILE, 'rb') as f:
+                loaded_config = orjson.loads(f.read())
                 schedule_config.update(loaded_config)
+                saved_schedule_config = orjson.dumps(schedule_config, option=orjson.OPT_INDENT_2)
                 logger.info(f"✅ Loaded schedule config: {schedule_config['hour']:02d}:{schedule_config['minute']:02d}")
         else:
             logger.info("ℹ️ No config file found, using default schedule (10:00 AM)")
@@ -151,20 +287,118 @@ def load_schedule_config():
         logger.error(f"❌ Error loading schedule config: {e}")
 
 def save_schedule_config():
-    """Save schedule configuration to file"""
+    """Save schedule configuration to file atomically, skipping unchanged configs"""
+    global saved_schedule_config
+    tmp_file = None
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(schedule_config, f, indent=2)
+        with schedule_config_lock:
+            data = orjson.dumps(schedule_config, option=orjson.OPT_INDENT_2)
+            if data == saved_schedule_config:
+                return
+            
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(CONFIG_FILE)), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, CONFIG_FILE)
+            tmp_file = None
+            
+            saved_schedule_config = data
         logger.info(f"✅ Saved schedule config: {schedule_config['hour']:02d}:{schedule_config['minute']:02d}")
     except Exception as e:
         logger.error(f"❌ Error saving schedule config: {e}")
+        if tmp_file:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
 
 # ===========================
 # ERROR NOTIFICATION SYSTEM
 # ===========================
 
+# Notification email body, filled in with str.format by send_error_notification
+NOTIFICATION_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background: {bg_color}; color: white; padding: 20px; border-radius: 5px; }}
+        .content {{ background: #f8f9fa; padding: 20px; margin-top: 20px; border-radius: 5px; }}
+        .error-box {{ background: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; margin: 15px 0; }}
+        .success-box {{ background: #d4edda; border-left: 4px solid #28a745; padding: 15px; margin: 15px 0; }}
+        .info {{ background: white; padding: 15px; margin: 10px 0; border-radius: 3px; }}
+        .footer {{ margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 12px; color: #666; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>{icon} {error_type}</h2>
+            <p>QuantoPick Email Scheduler</p>
+        </div>
+
+        <div class="content">
+            <h3>Notification Details</h3>
+            <div class="{box_class}">
+                <strong>Type:</strong> {error_type}<br>
+                <strong>Time:</strong> {timestamp}<br>
+                <strong>Environment:</strong> {environment}
+            </div>
+
+            <div class="info">
+                <strong>Message:</strong>
+                <pre style="white-space: pre-wrap; word-wrap: break-word;">{error_message}</pre>
+            </div>
+
+            {additional_info_block}
+
+            <div class="info">
+                <strong>Current Schedule:</strong> {hour:02d}:{minute:02d} Dubai Time<br>
+                <strong>Last Successful Run:</strong> {last_run}<br>
+                <strong>Emails Sent in Last Run:</strong> {emails_sent}
+            </div>
+        </div>
+
+        <div class="footer">
+            <p>This is an automated alert from QuantoPick Email API</p>
+            <p>Please check the logs and address the issue if needed.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+# Severity color of each notification type's header (read-only)
+SEVERITY_COLORS = MappingProxyType({
+    "API Started": "#28a745",
+    "Schedule Updated": "#17a2b8",
+    "Health Monitoring Alert": "#ffc107",
+    "Partial Email Failure": "#fd7e14",
+    "Configuration Error": "#dc3545",
+    "Contact Fetch Error": "#dc3545",
+    "Template Error": "#dc3545",
+    "Critical Error": "#dc3545",
+    "Monitoring Exception": "#dc3545",
+    "Scheduler Exception": "#dc3545",
+    "Email Sent Successfully": "#28a745",
+    "Email Delivery Status": "#17a2b8"
+})
+
+# Notification types rendered as good news (green box, ✅ icon)
+SUCCESS_NOTIFICATION_TYPES = frozenset({"API Started", "Schedule Updated", "Email Sent Successfully"})
+
+def _deliver_notification(payload):
+    """POST a rendered notification email - runs on notification_executor"""
+    try:
+        response = _post_mail(payload)
+        logger.info(f"✅ Notification sent to {ALERT_EMAIL} - Status: {response.status_code}")
+    except Exception as e:
+        logger.exception(f"❌ Failed to send notification: {str(e)}")
+
 def send_error_notification(error_type, error_message, additional_info=None):
-    """Send email notification when an error occurs"""
+    """Render an error notification email and queue it for background delivery"""
     try:
         if not ALERT_EMAIL:
             logger.warning("⚠️ No ALERT_EMAIL configured - cannot send error notification")
@@ -174,101 +408,97 @@ def send_error_notification(error_type, error_message, additional_info=None):
             logger.error("❌ Cannot send error notification - missing SendGrid config")
             return False
         
-        now_uae = datetime.now(UAE_TZ)
-        
-        # Determine severity color
-        severity_colors = {
-            "API Started": "#28a745",
-            "Schedule Updated": "#17a2b8",
-            "Health Monitoring Alert": "#ffc107",
-            "Partial Email Failure": "#fd7e14",
-            "Configuration Error": "#dc3545",
-            "Contact Fetch Error": "#dc3545",
-            "Template Error": "#dc3545",
-            "Critical Error": "#dc3545",
-            "Monitoring Exception": "#dc3545",
-            "Scheduler Exception": "#dc3545",
-            "Email Sent Successfully": "#28a745",
-            "Email Delivery Status": "#17a2b8"
-        }
+        now = time.monotonic()
+        with notification_lock:
+            last_queued = last_notification_at.get(error_type)
+            if last_queued is not None and now - last_queued < NOTIFICATION_DEDUPE_SECONDS:
+                logger.info(f"🔕 Skipping repeated {error_type} notification")
+                return False
+            last_notification_at[error_type] = now
         
-        bg_color = severity_colors.get(error_type, "#dc3545")
-        is_success = error_type in ["API Started", "Schedule Updated", "Email Sent Successfully"]
+        bg_color = SEVERITY_COLORS.get(error_type, "#dc3545")
+        is_success = error_type in SUCCESS_NOTIFICATION_TYPES
         icon = "✅" if is_success else "🚨"
         
-        error_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: {bg_color}; color: white; padding: 20px; border-radius: 5px; }}
-                .content {{ background: #f8f9fa; padding: 20px; margin-top: 20px; border-radius: 5px; }}
-                .error-box {{ background: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; margin: 15px 0; }}
-                .success-box {{ background: #d4edda; border-left: 4px solid #28a745; padding: 15px; margin: 15px 0; }}
-                .info {{ background: white; padding: 15px; margin: 10px 0; border-radius: 3px; }}
-                .footer {{ margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 12px; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h2>{icon} {error_type}</h2>
-                    <p>QuantoPick Email Scheduler</p>
-                </div>
-                
-                <div class="content">
-                    <h3>Notification Details</h3>
-                    <div class="{'success-box' if is_success else 'error-box'}">
-                        <strong>Type:</strong> {error_type}<br>
-                        <strong>Time:</strong> {now_uae.strftime('%Y-%m-%d %H:%M:%S %Z')}<br>
-                        <strong>Environment:</strong> {ENVIRONMENT}
-                    </div>
-                    
-                    <div class="info">
-                        <strong>Message:</strong>
-                        <pre style="white-space: pre-wrap; word-wrap: break-word;">{error_message}</pre>
-                    </div>
-                    
-                    {f'<div class="info"><strong>Additional Information:</strong><pre>{additional_info}</pre></div>' if additional_info else ''}
-                    
-                    <div class="info">
-                        <strong>Current Schedule:</strong> {schedule_config['hour']:02d}:{schedule_config['minute']:02d} Dubai Time<br>
-                        <strong>Last Successful Run:</strong> {last_execution.get('timestamp', 'Never')}<br>
-                        <strong>Emails Sent in Last Run:</strong> {last_execution.get('emails_sent', 0)}
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <p>This is an automated alert from QuantoPick Email API</p>
-                    <p>Please check the logs and address the issue if needed.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        message = Mail(
-            from_email=From(SENDER_EMAIL, "QuantoPick Alert System"),
-            to_emails=To(ALERT_EMAIL),
-            subject=f"{icon} {error_type} - QuantoPick Email API",
-            html_content=HtmlContent(error_html)
+        additional_info_block = ''
+        if additional_info:
+            additional_info = str(additional_info)
+            if len(additional_info) > MAX_NOTIFICATION_INFO_CHARS:
+                # The end of a traceback is the part that matters
+                additional_info = "... (truncated)\n" + additional_info[-MAX_NOTIFICATION_INFO_CHARS:]
+            additional_info_block = f'<div class="info"><strong>Additional Information:</strong><pre>{html_lib.escape(additional_info)}</pre></div>'
+        
+        error_html = NOTIFICATION_HTML.format(
+            bg_color=bg_color,
+            icon=icon,
+            error_type=html_lib.escape(error_type),
+            box_class='success-box' if is_success else 'error-box',
+            timestamp=uae_timestamp(),
+            environment=ENVIRONMENT,
+            error_message=html_lib.escape(str(error_message)),
+            additional_info_block=additional_info_block,
+            hour=schedule_config['hour'],
+            minute=schedule_config['minute'],
+            last_run=last_execution.get('timestamp', 'Never'),
+            emails_sent=last_execution.get('emails_sent', 0)
         )
         
-        response = sg.send(message)
-        logger.info(f"✅ Notification sent to {ALERT_EMAIL} - Status: {response.status_code}")
+        payload = {
+            "from": {"email": SENDER_EMAIL, "name": "QuantoPick Alert System"},
+            "personalizations": [{"to": [{"email": ALERT_EMAIL}]}],
+            "subject": f"{icon} {error_type} - QuantoPick Email API",
+            "content": [{"type": "text/html", "value": error_html}]
+        }
+        
+        with notification_lock:
+            # The single worker finishes alerts in order, so done ones sit at the front
+            while pending_notifications and pending_notifications[0].done():
+                pending_notifications.popleft()
+            
+            while len(pending_notifications) >= MAX_PENDING_NOTIFICATIONS:
+                if pending_notifications.popleft().cancel():
+                    logger.warning("⚠️ Notification queue full - dropped the oldest pending alert")
+            
+            pending_notifications.append(notification_executor.submit(_deliver_notification, payload))
         return True
         
     except Exception as e:
-        logger.exception(f"❌ Failed to send notification: {str(e)}")
+        logger.exception(f"❌ Failed to queue notification: {str(e)}")
         return False
 
 # ===========================
 # MONITORING FUNCTIONS
 # ===========================
 
+def _get_verified_senders(refresh=False):
+    """Return (senders keyed by from_email, response), cached for SENDER_CHECK_CACHE_SECONDS unless refreshed"""
+    global verified_senders_cache
+    if not refresh and verified_senders_cache and time.monotonic() - verified_senders_cache[0] < SENDER_CHECK_CACHE_SECONDS:
+        return verified_senders_cache[1], None
+    
+    response = SENDGRID_SESSION.get(
+        "https://api.sendgrid.com/v3/verified_senders",
+        timeout=SENDGRID_LOOKUP_TIMEOUT
+    )
+    if response.status_code != 200:
+        return None, response
+    
+    senders = {}
+    for sender in response.json().get("results", []):
+        senders.setdefault(sender.get("from_email"), sender)
+    
+    verified_senders_cache = (time.monotonic(), senders)
+    return senders, response
+
+def _is_sender_verified(sender):
+    """Read the verified flag of a verified_senders entry (bool or {"status": bool})"""
+    verified_field = sender.get("verified")
+    if isinstance(verified_field, bool):
+        return verified_field
+    if isinstance(verified_field, dict):
+        return verified_field.get("status", False)
+    return False
+
 def check_sendgrid_config():
     """Check if SendGrid is properly configured"""
     issues = []
@@ -285,28 +515,11 @@ def check_sendgrid_config():
     # Check sender verification
     try:
         if SENDGRID_API_KEY and SENDER_EMAIL:
-            headers = {
-                "Authorization": f"Bearer {SENDGRID_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            response = requests.get(
-                "https://api.sendgrid.com/v3/verified_senders",
-                headers=headers,
-                timeout=10
-            )
+            senders, response = _get_verified_senders()
             
-            if response.status_code == 200:
-                senders = response.json().get("results", [])
-                is_verified = False
-                
-                for sender in senders:
-                    if sender.get("from_email") == SENDER_EMAIL:
-                        verified_field = sender.get("verified")
-                        if isinstance(verified_field, bool):
-                            is_verified = verified_field
-                        elif isinstance(verified_field, dict):
-                            is_verified = verified_field.get("status", False)
-                        break
+            if senders is not None:
+                sender = senders.get(SENDER_EMAIL)
+                is_verified = sender is not None and _is_sender_verified(sender)
                 
                 if not is_verified:
                     issues.append(f"Sender email {SENDER_EMAIL} is not verified in SendGrid")
@@ -330,22 +543,32 @@ def check_last_execution_status():
         issues.append(f"Last execution failed: {last_execution.get('error', 'Unknown error')}")
     
     # Check if last execution was too long ago (more than 25 hours)
-    try:
-        last_time_str = last_execution.get('timestamp')
-        if last_time_str:
-            last_time = datetime.strptime(last_time_str.rsplit(' ', 1)[0], '%Y-%m-%d %H:%M:%S')
-            last_time = UAE_TZ.localize(last_time)
-            
-            now = datetime.now(UAE_TZ)
-            time_diff = now - last_time
-            
-            if time_diff > timedelta(hours=25):
-                issues.append(f"No email sent in last 25 hours (last: {last_time_str})")
-    except Exception as e:
-        issues.append(f"Error parsing last execution timestamp: {str(e)}")
+    if last_execution_at and datetime.now(UAE_TZ) - last_execution_at > timedelta(hours=25):
+        issues.append(f"No email sent in last 25 hours (last: {last_execution['timestamp']})")
     
     return issues
 
+def _fetch_contacts_sample():
+    """Fetch a contacts sample via GET, falling back to (and sticking with) POST search"""
+    global contacts_search_until
+    if time.monotonic() >= contacts_search_until:
+        response = SENDGRID_SESSION.get(
+            "https://api.sendgrid.com/v3/marketing/contacts",
+            timeout=SENDGRID_LOOKUP_TIMEOUT
+        )
+        if response.status_code == 200:
+            return response
+        
+        logger.warning("⚠️ GET contacts failed (HTTP %s), using search API...", response.status_code)
+        contacts_search_until = time.monotonic() + CONTACTS_SEARCH_STICKY_SECONDS
+    
+    search_payload = {"query": ""}
+    return SENDGRID_SESSION.post(
+        "https://api.sendgrid.com/v3/marketing/contacts/search",
+        data=orjson.dumps(search_payload),
+        timeout=SENDGRID_LOOKUP_TIMEOUT
+    )
+
 def check_sendgrid_contacts():
     """Check if there are contacts in SendGrid"""
     issues = []
@@ -354,25 +577,7 @@ def check_sendgrid_contacts():
         if not SENDGRID_API_KEY:
             return ["SendGrid API key not configured"]
         
-        headers = {
-            "Authorization": f"Bearer {SENDGRID_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.get(
-            "https://api.sendgrid.com/v3/marketing/contacts",
-            headers=headers,
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            search_payload = {"query": ""}
-            response = requests.post(
-                "https://api.sendgrid.com/v3/marketing/contacts/search",
-                headers=headers,
-                json=search_payload,
-                timeout=10
-            )
+        response = _fetch_contacts_sample()
         
         if response.status_code == 200:
             contacts = response.json().get("result", [])
@@ -385,18 +590,29 @@ def check_sendgrid_contacts():
     
     return issues
 
-def run_health_monitoring():
-    """Run comprehensive health monitoring"""
+def run_health_monitoring(force=False):
+    """Run comprehensive health monitoring, debounced unless forced"""
+    global last_monitoring_run, monitoring_status
+    if not force and last_monitoring_run and time.monotonic() - last_monitoring_run < MONITORING_DEBOUNCE_SECONDS:
+        logger.info("📊 Reusing health monitoring result from the last %ss", MONITORING_DEBOUNCE_SECONDS)
+        return monitoring_status["issues_found"]
+    
     try:
-        now_uae = datetime.now(UAE_TZ)
-        logger.info(f"🔍 [{now_uae.strftime('%Y-%m-%d %H:%M:%S')}] Running health monitoring...")
+        checked_at = uae_timestamp()
+        logger.info(f"🔍 [{checked_at}] Running health monitoring...")
         
         all_issues = []
         checks_passed = 0
         checks_failed = 0
         
+        # Two of the checks wait on SendGrid, so start all three at once and
+        # collect them in order below
+        config_future = health_check_executor.submit(check_sendgrid_config)
+        exec_future = health_check_executor.submit(check_last_execution_status)
+        contacts_future = health_check_executor.submit(check_sendgrid_contacts)
+        
         logger.info("1️⃣ Checking SendGrid configuration...")
-        config_issues = check_sendgrid_config()
+        config_issues = config_future.result()
         if config_issues:
             all_issues.extend(config_issues)
             checks_failed += 1
@@ -406,7 +622,7 @@ def run_health_monitoring():
             logger.info("  ✅ SendGrid configuration OK")
         
         logger.info("2️⃣ Checking last execution status...")
-        exec_issues = check_last_execution_status()
+        exec_issues = exec_future.result()
         if exec_issues:
             all_issues.extend(exec_issues)
             checks_failed += 1
@@ -416,7 +632,7 @@ def run_health_monitoring():
             logger.info("  ✅ Last execution OK")
         
         logger.info("3️⃣ Checking SendGrid contacts...")
-        contact_issues = check_sendgrid_contacts()
+        contact_issues = contacts_future.result()
         if contact_issues:
             all_issues.extend(contact_issues)
             checks_failed += 1
@@ -425,11 +641,14 @@ def run_health_monitoring():
             checks_passed += 1
             logger.info("  ✅ Contacts check OK")
         
-        monitoring_status["last_check"] = now_uae.strftime('%Y-%m-%d %H:%M:%S %Z')
-        monitoring_status["issues_found"] = all_issues
-        monitoring_status["checks_passed"] = checks_passed
-        monitoring_status["checks_failed"] = checks_failed
-        monitoring_status["status"] = "Healthy" if not all_issues else "Issues Found"
+        # Swap in a complete dict so concurrent readers never see a half-updated status
+        monitoring_status = {
+            "last_check": checked_at,
+            "status": "Healthy" if not all_issues else "Issues Found",
+            "issues_found": all_issues,
+            "checks_passed": checks_passed,
+            "checks_failed": checks_failed
+        }
         
         if all_issues:
             logger.warning(f"⚠️ Monitoring found {len(all_issues)} issue(s)")
@@ -442,16 +661,21 @@ def run_health_monitoring():
         else:
             logger.info(f"✅ Health monitoring passed all checks ({checks_passed} checks)")
         
+        last_monitoring_run = time.monotonic()
         return all_issues
         
     except Exception as e:
         error_msg = f"Error during health monitoring: {str(e)}"
-        error_trace = traceback.format_exc()
+        # Only needed for the alert email; logger.exception records it for the logs
+        error_trace = traceback.format_exc() if ALERT_EMAIL else None
         logger.exception(f"❌ {error_msg}")
         
-        monitoring_status["last_check"] = datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
-        monitoring_status["status"] = "Error"
-        monitoring_status["issues_found"] = [error_msg]
+        monitoring_status = {
+            **monitoring_status,
+            "last_check": uae_timestamp(),
+            "status": "Error",
+            "issues_found": [error_msg]
+        }
         
         send_error_notification("Monitoring Exception", error_msg, error_trace)
         return [error_msg]
@@ -462,9 +686,8 @@ def scheduled_monitoring_job():
         logger.info("📊 Monitoring is disabled")
         return
     
-    with app.app_context():
-        logger.info("📊 Running scheduled health monitoring...")
-        run_health_monitoring()
+    logger.info("📊 Running scheduled health monitoring...")
+    run_health_monitoring()
 
 # ===========================
 # ROUTES
@@ -472,12 +695,11 @@ def scheduled_monitoring_job():
 
 @app.route('/', methods=['GET'])
 def home():
-    now_uae = datetime.now(UAE_TZ)
     return jsonify({
         "message": "Email API is working!",
         "status": "active",
         "schedule": f"Daily at {schedule_config['hour']:02d}:{schedule_config['minute']:02d} UAE time",
-        "current_time_uae": now_uae.strftime('%Y-%m-%d %H:%M:%S %Z'),
+        "current_time_uae": uae_timestamp(),
         "environment": ENVIRONMENT,
         "monitoring_enabled": ENABLE_MONITORING,
         "last_execution": last_execution,
@@ -494,17 +716,18 @@ def cors_test():
         "status": "success",
         "message": "CORS is working!",
         "origin": request.headers.get('Origin', 'Unknown'),
-        "timestamp": datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+        "timestamp": uae_timestamp()
     }), 200
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint for monitoring"""
-    now_uae = datetime.now(UAE_TZ)
+    # One read of the global, so the body and status code agree even if a pass finishes meanwhile
+    current_monitoring = monitoring_status
     
     health_status = {
         "status": "healthy",
-        "timestamp": now_uae.strftime('%Y-%m-%d %H:%M:%S %Z'),
+        "timestamp": uae_timestamp(),
         "checks": {
             "sendgrid_configured": bool(SENDGRID_API_KEY),
             "sender_email_configured": bool(SENDER_EMAIL),
@@ -517,16 +740,16 @@ def health():
             "last_execution": last_execution,
             "current_schedule": schedule_config
         },
-        "monitoring": monitoring_status if ENABLE_MONITORING else None
+        "monitoring": current_monitoring if ENABLE_MONITORING else None
     }
     
     if not all([SENDGRID_API_KEY, SENDER_EMAIL]):
         health_status["status"] = "degraded"
         health_status["warning"] = "Missing critical configuration"
     
-    if ENABLE_MONITORING and monitoring_status.get("issues_found"):
+    if ENABLE_MONITORING and current_monitoring.get("issues_found"):
         health_status["status"] = "degraded"
-        health_status["warning"] = f"Monitoring found {len(monitoring_status['issues_found'])} issue(s)"
+        health_status["warning"] = f"Monitoring found {len(current_monitoring['issues_found'])} issue(s)"
     
     status_code = 200 if health_status["status"] == "healthy" else 503
     return jsonify(health_status), status_code
@@ -589,7 +812,7 @@ def update_schedule():
         
         schedule_config['hour'] = hour
         schedule_config['minute'] = minute
-        schedule_config['last_updated'] = datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+        schedule_config['last_updated'] = uae_timestamp()
         schedule_config['updated_by'] = updated_by
         
         save_schedule_config()
@@ -613,7 +836,7 @@ def update_schedule():
         
     except Exception as e:
         error_msg = f"Error updating schedule: {str(e)}"
-        error_trace = traceback.format_exc()
+        error_trace = traceback.format_exc() if ALERT_EMAIL else None
         logger.exception(f"❌ {error_msg}")
         
         send_error_notification("Schedule Update Failed", error_msg, error_trace)
@@ -625,69 +848,41 @@ def update_schedule():
 
 @app.route('/check-sender', methods=['GET'])
 def check_sender():
-    """Check if sender email is verified in SendGrid"""
+    """Check if sender email is verified in SendGrid - ?refresh=1 skips the cached list"""
     try:
         if not SENDGRID_API_KEY or not SENDER_EMAIL:
             return jsonify({
                 "status": "error",
                 "message": "Missing SendGrid API key or sender email in .env file"
             }), 400
-
-        headers = {
-            "Authorization": f"Bearer {SENDGRID_API_KEY}",
-            "Content-Type": "application/json"
-        }
         
-        response = requests.get(
-            "https://api.sendgrid.com/v3/verified_senders",
-            headers=headers
-        )
+        senders, response = _get_verified_senders(refresh=request.args.get('refresh') == '1')
         
-        logger.info(f"🔍 Verified Senders Response Status: {response.status_code}")
+        if response is not None:
+            logger.info("🔍 Verified Senders Response Status: %s", response.status_code)
         
-        if response.status_code != 200:
+        if senders is None:
             return jsonify({
                 "status": "error",
                 "message": f"Failed to fetch verified senders: {response.text}"
             }), response.status_code
         
-        senders_data = response.json()
-        senders = senders_data.get("results", [])
+        verified_emails = [email for email, sender in senders.items() if _is_sender_verified(sender)]
         
         is_verified = False
         sender_info = None
+        sender = senders.get(SENDER_EMAIL)
+        
+        if sender is not None:
+            is_verified = _is_sender_verified(sender)
+            sender_info = {
+                "email": sender.get("from_email"),
+                "name": sender.get("from_name"),
+                "verified": is_verified,
+                "created_at": sender.get("created_at")
+            }
         
-        for sender in senders:
-            if sender.get("from_email") == SENDER_EMAIL:
-                verified_field = sender.get("verified")
-                
-                if isinstance(verified_field, bool):
-                    is_verified = verified_field
-                elif isinstance(verified_field, dict):
-                    is_verified = verified_field.get("status", False)
-                
-                sender_info = {
-                    "email": sender.get("from_email"),
-                    "name": sender.get("from_name"),
-                    "verified": is_verified,
-                    "created_at": sender.get("created_at")
-                }
-                break
-        
-        verified_emails = []
-        for s in senders:
-            verified_field = s.get("verified")
-            is_sender_verified = False
-            
-            if isinstance(verified_field, bool):
-                is_sender_verified = verified_field
-            elif isinstance(verified_field, dict):
-                is_sender_verified = verified_field.get("status", False)
-            
-            if is_sender_verified:
-                verified_emails.append(s.get("from_email"))
-        
-        return jsonify({
+        result = {
             "status": "success",
             "sender_email_configured": SENDER_EMAIL,
             "is_verified": is_verified,
@@ -695,7 +890,9 @@ def check_sender():
             "all_verified_senders": verified_emails,
             "message": "✅ Sender is verified!" if is_verified else f"❌ {SENDER_EMAIL} is NOT verified",
             "verification_url": "https://app.sendgrid.com/settings/sender_auth/senders"
-        }), 200
+        }
+        
+        return jsonify(result), 200
         
     except Exception as e:
         logger.exception("❌ Error checking sender verification:")
@@ -708,14 +905,14 @@ def check_sender():
 def status():
     """Detailed status of the email scheduler"""
     try:
-        now_uae = datetime.now(UAE_TZ)
         return jsonify({
             "status": "running",
             "message": "Email scheduler is active",
-            "current_time_uae": now_uae.strftime('%Y-%m-%d %H:%M:%S %Z'),
+            "current_time_uae": uae_timestamp(),
             "schedule": f"Daily at {schedule_config['hour']:02d}:{schedule_config['minute']:02d} UAE time",
             "schedule_config": schedule_config,
             "last_execution": last_execution,
+            "last_test_send": last_test_send,
             "monitoring": {
                 "enabled": ENABLE_MONITORING,
                 "interval_hours": MONITORING_INTERVAL_HOURS if ENABLE_MONITORING else None,
@@ -741,13 +938,15 @@ def manual_monitor():
     """Manually trigger health monitoring"""
     try:
         logger.info("🔧 Manual monitoring triggered...")
-        issues = run_health_monitoring()
+        issues = run_health_monitoring(force=request.args.get('force') == '1')
+        # One read of the global, so both counts come from the same pass
+        current_monitoring = monitoring_status
         
         return jsonify({
             "status": "success" if not issues else "issues_found",
-            "timestamp": datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z'),
-            "checks_passed": monitoring_status.get("checks_passed", 0),
-            "checks_failed": monitoring_status.get("checks_failed", 0),
+            "timestamp": uae_timestamp(),
+            "checks_passed": current_monitoring.get("checks_passed", 0),
+            "checks_failed": current_monitoring.get("checks_failed", 0),
             "issues": issues
         }), 200 if not issues else 207
         
@@ -758,9 +957,32 @@ def manual_monitor():
             "error": str(e)
         }), 500
 
+def _run_test_send(started_at):
+    """Run a manual test send and record its outcome in last_test_send"""
+    global last_test_send
+    try:
+        success, message, count = send_emails_with_subject("🧪 TEST - Daily Forex Signals")
+        last_test_send = {
+            "timestamp": started_at,
+            "status": "Success" if success else "Failed",
+            "message": message,
+            "emails_sent": count,
+            "error": None if success else message
+        }
+    except Exception as e:
+        logger.exception("❌ Error in manual test send:")
+        last_test_send = {
+            "timestamp": started_at,
+            "status": "Error",
+            "message": "",
+            "emails_sent": 0,
+            "error": str(e)
+        }
+
 @app.route('/trigger-test', methods=['POST'])
 def trigger_test():
-    """Manual trigger for testing - requires API key in header for security"""
+    """Start a test send in the background - requires API key in header for security"""
+    global manual_send_future, last_test_send
     try:
         api_key = request.headers.get('X-API-Key')
         expected_key = os.getenv('MANUAL_TRIGGER_KEY', 'test-key-12345')
@@ -771,15 +993,29 @@ def trigger_test():
                 "message": "Unauthorized - Invalid API key"
             }), 401
         
-        logger.info("🔧 Manual trigger initiated...")
-        success, message, count = send_emails_with_subject("🧪 TEST - Daily Forex Signals")
+        with manual_send_lock:
+            if manual_send_future is not None and not manual_send_future.done():
+                return jsonify({
+                    "status": "error",
+                    "message": "A test send is already running"
+                }), 409
+            
+            logger.info("🔧 Manual trigger initiated...")
+            started_at = uae_timestamp()
+            last_test_send = {
+                "timestamp": started_at,
+                "status": "Running",
+                "message": "",
+                "emails_sent": 0,
+                "error": None
+            }
+            manual_send_future = manual_send_executor.submit(_run_test_send, started_at)
         
         return jsonify({
-            "status": "success" if success else "error",
-            "message": message,
-            "emails_sent": count,
-            "timestamp": datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
-        }), 200 if success else 500
+            "status": "accepted",
+            "message": "Test send started - poll GET /last-test-send for the result",
+            "timestamp": started_at
+        }), 202
         
     except Exception as e:
         logger.exception("❌ Error in manual trigger:")
@@ -793,7 +1029,15 @@ def get_last_execution():
     """Get details of the last execution"""
     return jsonify({
         "last_execution": last_execution,
-        "current_time_uae": datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+        "current_time_uae": uae_timestamp()
+    }), 200
+
+@app.route('/last-test-send', methods=['GET'])
+def get_last_test_send():
+    """Get the outcome of the last /trigger-test send"""
+    return jsonify({
+        "last_test_send": last_test_send,
+        "current_time_uae": uae_timestamp()
     }), 200
 
 @app.route('/monitoring-report', methods=['GET'])
@@ -815,67 +1059,329 @@ def monitoring_report():
             "alert_email": ALERT_EMAIL if ALERT_EMAIL else "Not configured",
             "environment": ENVIRONMENT
         },
-        "current_time_uae": datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+        "current_time_uae": uae_timestamp()
     }), 200
 
 # ===========================
 # EMAIL SENDING LOGIC
 # ===========================
 
+@lru_cache(maxsize=4)
+def _load_template(path, mtime):
+    """Read the email template - cached until the file's mtime changes"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+def _export_contacts():
+    """Return a stream of (email, first_name) tuples from a recent or new contact export, or None"""
+    global contact_export_cache
+    with contact_export_lock:
+        if contact_export_cache and time.monotonic() - contact_export_cache[0] < CONTACT_EXPORT_CACHE_SECONDS:
+            logger.info("♻️ Reusing recent contact export")
+            return _iter_exported_contacts(contact_export_cache[1])
+        
+        urls = _run_contact_export()
+        if urls is None:
+            return None
+        
+        contact_export_cache = (time.monotonic(), urls)
+        return _iter_exported_contacts(urls)
+
+def _run_contact_export():
+    """Start a contact export job and wait for it - returns its download URLs or None"""
+    try:
+        response = SENDGRID_SESSION.post(
+            "https://api.sendgrid.com/v3/marketing/contacts/exports",
+            data=orjson.dumps({"file_type": "csv"}),
+            timeout=SENDGRID_SEND_TIMEOUT
+        )
+        if response.status_code not in (200, 202):
+            logger.warning("⚠️ Contact export request failed - Status: %s", response.status_code)
+            return None
+        
+        export_id = response.json()["id"]
+        deadline = time.monotonic() + CONTACT_EXPORT_TIMEOUT_SECONDS
+        
+        while True:
+            response = SENDGRID_SESSION.get(
+                f"https://api.sendgrid.com/v3/marketing/contacts/exports/{export_id}",
+                timeout=SENDGRID_SEND_TIMEOUT
+            )
+            export_status = response.json() if response.status_code == 200 else {}
+            
+            if export_status.get("status") == "ready":
+                logger.info("✅ Contact export %s ready", export_id)
+                return export_status.get("urls", [])
+            
+            if export_status.get("status") == "failure":
+                logger.warning("⚠️ Contact export %s failed: %s", export_id, export_status.get('message'))
+                return None
+            
+            if time.monotonic() >= deadline:
+                logger.warning("⚠️ Contact export %s not ready after %ss", export_id, CONTACT_EXPORT_TIMEOUT_SECONDS)
+                return None
+            
+            time.sleep(CONTACT_EXPORT_POLL_SECONDS)
+    
+    except Exception as e:
+        logger.warning("⚠️ Error exporting contacts: %s", e)
+        return None
+
+def _iter_exported_contacts(urls):
+    """Stream (email, first_name) tuples row by row from exported CSV files (optionally gzip'd)"""
+    for url in urls:
+        with EXPORT_DOWNLOAD_SESSION.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # urllib3 closes the raw stream at EOF by default, which makes the
+            # BufferedReader's next read raise instead of returning b''
+            response.raw.auto_close = False
+            
+            stream = io.BufferedReader(response.raw)
+            if stream.peek(2)[:2] == b"\x1f\x8b":
+                stream = gzip.GzipFile(fileobj=stream)
+            
+            reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+            
+            # Exports carry every contact field; index the two columns we need
+            # rather than building a dict of all of them per row
+            header = [column.lower() for column in next(reader, [])]
+            if "email" not in header:
+                logger.warning("⚠️ Contact export file has no email column, skipping")
+                continue
+            
+            email_idx = header.index("email")
+            name_idx = header.index("first_name") if "first_name" in header else None
+            
+            for row in reader:
+                if len(row) <= email_idx or not row[email_idx]:
+                    continue
+                
+                name = "Trader"
+                if name_idx is not None and name_idx < len(row) and row[name_idx]:
+                    name = row[name_idx]
+                yield row[email_idx], name
+
+def _iter_batches(contacts, size):
+    """Group an iterable of contacts into lists of at most `size`"""
+    batch = []
+    for contact in contacts:
+        batch.append(contact)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class TokenBucket:
+    """Thread-safe token bucket letting at most `rate` calls start per second"""
+    
+    def __init__(self, rate):
+        if not rate > 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        # Room for at least one token, otherwise a rate below 1/s never allows a call
+        self.capacity = max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait_seconds = (1 - self.tokens) / self.rate
+            time.sleep(wait_seconds)
+
+if not 0 < MAIL_SEND_RATE_PER_SECOND < float('inf'):
+    logger.warning("⚠️ Invalid MAIL_SEND_RATE_PER_SECOND=%s, using 50", os.getenv('MAIL_SEND_RATE_PER_SECOND'))
+    MAIL_SEND_RATE_PER_SECOND = 50.0
+
+# Shared by all send workers so the fan-out stays under SendGrid's rate limit
+mail_send_bucket = TokenBucket(MAIL_SEND_RATE_PER_SECOND)
+
+def _retry_wait_seconds(response, attempt):
+    """Seconds to wait before retrying a Mail Send call, from rate-limit headers or backoff"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return min(60, max(1, int(retry_after)))
+    
+    reset_at = response.headers.get("X-RateLimit-Reset")
+    if reset_at and reset_at.isdigit():
+        return min(60, max(1, int(reset_at) - int(time.time())))
+    
+    return min(30, 2 ** attempt) + random.random() / 4
+
+def _post_mail(payload):
+    """POST a Mail Send payload over the pooled session, rate-limited and retrying 429/503"""
+    data = orjson.dumps(payload)
+    
+    for attempt in range(MAIL_SEND_MAX_RETRIES + 1):
+        mail_send_bucket.acquire()
+        response = SENDGRID_SESSION.post(
+            "https://api.sendgrid.com/v3/mail/send",
+            data=data,
+            timeout=SENDGRID_SEND_TIMEOUT
+        )
+        
+        # Other 5xx errors are not retried, as SendGrid may already have accepted the message
+        if response.status_code not in (429, 503) or attempt == MAIL_SEND_MAX_RETRIES:
+            break
+        
+        wait_seconds = _retry_wait_seconds(response, attempt)
+        logger.warning("⏳ SendGrid returned %s, retrying in %.1fs...", response.status_code, wait_seconds)
+        time.sleep(wait_seconds)
+    
+    response.raise_for_status()
+    return response
+
+def _send_one(email, name, html_parts, base_payload):
+    """Send the personalized email to a single contact"""
+    payload = {
+        **base_payload,
+        "personalizations": [{"to": [{"email": email}]}],
+        "content": [{"type": "text/html", "value": name.join(html_parts)}]
+    }
+    
+    response = _post_mail(payload)
+    logger.debug("✉️ Email sent to %s - Status: %s", email, response.status_code)
+    return response
+
+def _batch_failures(batch, batch_error):
+    """Record every contact of a batch as failed without re-sending any of them"""
+    error_details = str(batch_error)
+    if getattr(batch_error, 'response', None) is not None:
+        error_details = f"{error_details} - Body: {batch_error.response.text}"
+    
+    logger.error("❌ Batch send to %s contacts failed, not retrying: %s", len(batch), error_details)
+    return [{"email": email, "error": error_details} for email, _ in batch]
+
+def _send_batch(batch, html_parts, base_payload):
+    """Send one email to a batch of contacts; returns (sent_count, failed_emails)"""
+    has_name = len(html_parts) > 1
+    personalizations = []
+    
+    for email, name in batch:
+        personalization = {"to": [{"email": email}]}
+        if has_name:
+            personalization["substitutions"] = {"{{NAME}}": name}
+        personalizations.append(personalization)
+    
+    try:
+        response = _post_mail({**base_payload, "personalizations": personalizations})
+        logger.info("✉️ Batch email sent to %s contacts - Status: %s", len(batch), response.status_code)
+        return len(batch), []
+    except requests.HTTPError as batch_error:
+        # Only a 400 rejects the batch outright; after anything else SendGrid may
+        # already have accepted it, so re-sending could deliver it twice
+        if batch_error.response is None or batch_error.response.status_code != 400:
+            return 0, _batch_failures(batch, batch_error)
+        logger.warning("⚠️ Batch send to %s contacts rejected (%s), retrying individually...", len(batch), batch_error)
+    except Exception as batch_error:
+        return 0, _batch_failures(batch, batch_error)
+    
+    sent_count = 0
+    failed_emails = []
+    
+    # Sent one after another: this already runs on one of EMAIL_WORKERS batch
+    # workers, and nesting another pool would outgrow SENDGRID_SESSION's connection pool
+    for email, name in batch:
+        try:
+            _send_one(email, name, html_parts, base_payload)
+            sent_count += 1
+            
+        except Exception as email_error:
+            error_details = str(email_error)
+            logger.error("❌ Failed to send email to %s: %s", email, error_details)
+            
+            if getattr(email_error, 'response', None) is not None:
+                error_details = f"{error_details} - Body: {email_error.response.text}"
+            
+            failed_emails.append({
+                "email": email,
+                "error": error_details
+            })
+    
+    logger.info("✉️ Sent %s/%s emails individually after batch failure", sent_count, len(batch))
+    return sent_count, failed_emails
+
 def send_emails_with_subject(subject_prefix="📊 Daily Forex Signals - Forex_Bullion"):
     """Generic function to send emails with customizable subject"""
+    global contact_export_cache
     try:
-        logger.info(f"📧 Starting email send process with subject: {subject_prefix}")
+        logger.info("📧 Starting email send process with subject: %s", subject_prefix)
         
         if not SENDGRID_API_KEY or not SENDER_EMAIL:
             error_msg = "Missing SendGrid API key or sender email"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             send_error_notification("Configuration Error", error_msg)
             return False, error_msg, 0
 
-        headers = {
-            "Authorization": f"Bearer {SENDGRID_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        logger.info("🔍 Fetching contacts from SendGrid...")
-        
-        response = requests.get("https://api.sendgrid.com/v3/marketing/contacts", headers=headers)
-        logger.info(f"📊 GET Response Status: {response.status_code}")
-        
-        contacts = []
-        
-        if response.status_code != 200:
-            logger.warning(f"⚠️ GET request failed, trying search API...")
-            search_payload = {"query": ""}
-            response = requests.post(
-                "https://api.sendgrid.com/v3/marketing/contacts/search",
-                headers=headers,
-                json=search_payload
-            )
-            logger.info(f"📊 POST Search Response Status: {response.status_code}")
+        logger.info("🔍 Exporting contacts from SendGrid...")
+        contacts = _export_contacts()
+        # Set when the export can't be used and only the contacts API's sample is mailed
+        sample_only = False
+        
+        if contacts is not None:
+            # Contacts are streamed batch by batch rather than loaded into memory at once
+            batches = _iter_batches(contacts, MAX_PERSONALIZATIONS)
+            try:
+                first_batch = next(batches, None)
+            except Exception as e:
+                logger.warning("⚠️ Could not read contact export: %s", e)
+                contact_export_cache = None
+                contacts = None
+        
+        if contacts is None:
+            logger.warning("⚠️ Contact export unavailable, falling back to contacts API...")
+            
+            response = _fetch_contacts_sample()
+            logger.info("📊 Contacts Response Status: %s", response.status_code)
             
             if response.status_code != 200:
                 error_msg = f"Failed to fetch contacts. Status: {response.status_code}, Response: {response.text}"
-                logger.error(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 send_error_notification("Contact Fetch Error", error_msg, f"Response: {response.text[:500]}")
                 return False, error_msg, 0
-        
-        contacts = response.json().get("result", [])
-        
-        if not contacts:
+            
+            # Same (email, first_name) shape as the export stream, so the send loop only unpacks tuples
+            contacts = [
+                (contact["email"], contact.get("first_name") or "Trader")
+                for contact in response.json().get("result", [])
+                if contact.get("email")
+            ]
+            batches = _iter_batches(contacts, MAX_PERSONALIZATIONS)
+            first_batch = next(batches, None)
+            sample_only = True
+        
+        if first_batch is None:
+            if sample_only:
+                error_msg = "Contact export unavailable and the contacts API returned no contacts"
+                logger.error("❌ %s", error_msg)
+                send_error_notification("Contact Fetch Error", error_msg)
+                return False, error_msg, 0
+            
             logger.warning("ℹ️ No contacts found in SendGrid")
             return True, "No contacts found", 0
         
-        logger.info(f"✅ Successfully fetched {len(contacts)} contacts")
+        if sample_only:
+            logger.warning("⚠️ Mailing only a sample of %s contacts from the contacts API", len(first_batch))
+        else:
+            logger.info("✅ Successfully fetched contacts")
 
         try:
-            with open(TEMPLATE_PATH, 'r', encoding='utf-8') as file:
-                template = file.read()
-            logger.info(f"✅ Template loaded from {TEMPLATE_PATH}")
+            template = _load_template(TEMPLATE_PATH, os.path.getmtime(TEMPLATE_PATH))
+            logger.info("✅ Template loaded from %s", TEMPLATE_PATH)
         except FileNotFoundError:
             error_msg = f"Template file not found: {TEMPLATE_PATH}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             send_error_notification("Template Error", error_msg, f"Expected path: {os.path.abspath(TEMPLATE_PATH)}")
             return False, error_msg, 0
 
@@ -883,58 +1389,87 @@ def send_emails_with_subject(subject_prefix="📊 Daily Forex Signals - Forex_Bu
         today_str = now.strftime('%d %B %Y')
         timestamp = int(now.timestamp())
         
-        html = template.replace("{{TODAY}}", today_str)\
-                       .replace("{{TIMESTAMP}}", str(timestamp))\
-                       .replace("{{DATE}}", today_str)
-
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
+        tokens = {
+            "TODAY": today_str,
+            "TIMESTAMP": str(timestamp),
+            "DATE": today_str
+        }
+        # One pass over the template instead of a chain of full-length copies
+        html = TEMPLATE_TOKEN_RE.sub(lambda match: tokens[match.group(1)], template)
+        
+        # Split once around the name marker so each contact only needs a join
+        html_parts = html.split("{{NAME}}")
+        
+        # Everything but the recipients is identical for every message in this
+        # run, so the Mail Send body is built once and only the personalizations
+        # change per request
+        base_payload = {
+            "from": {"email": SENDER_EMAIL, "name": "QuantoPick"},
+            "subject": f"{subject_prefix} - {today_str}",
+            "content": [{"type": "text/html", "value": html}]
+        }
         
-        logger.info(f"📧 Starting to send emails to {len(contacts)} contacts...")
+        logger.info("📧 Starting to send emails in batches of up to %s contacts...", MAX_PERSONALIZATIONS)
+        total_contacts = 0
         sent_count = 0
+        failed_count = 0
         failed_emails = []
-        
-        for contact in contacts:
-            try:
-                email = contact.get("email")
-                name = contact.get("first_name", "Trader")
-                personalized_html = html.replace("{{NAME}}", name)
-                
-                subject = f"{subject_prefix} - {today_str}"
-                
-                message = Mail(
-                    from_email=From(SENDER_EMAIL, "QuantoPick"),
-                    to_emails=To(email),
-                    subject=subject,
-                    html_content=HtmlContent(personalized_html)
-                )
-                
-                response = sg.send(message)
-                logger.info(f"✉️ Email sent to {email} - Status: {response.status_code}")
-                sent_count += 1
+        stream_error = None
+        batches = itertools.chain([first_batch], batches)
+        
+        # SendGrid calls are network-bound, so overlap them on a thread pool
+        # sharing the pooled session. At most EMAIL_WORKERS batches are in
+        # flight, which keeps memory bounded while the export is streamed.
+        with ThreadPoolExecutor(max_workers=EMAIL_WORKERS) as executor:
+            pending = set()
+            
+            while True:
+                # A download can still fail mid-stream; keep what was already sent
+                try:
+                    batch = next(batches, None)
+                except Exception as e:
+                    stream_error = str(e)
+                    logger.error("❌ Contact export stream failed after %s contacts: %s", total_contacts, e)
+                    break
                 
-            except Exception as email_error:
-                error_details = str(email_error)
-                logger.error(f"❌ Failed to send email to {email}: {error_details}")
+                if batch is None:
+                    break
                 
-                if hasattr(email_error, 'body'):
-                    error_details = f"{error_details} - Body: {email_error.body}"
+                if len(pending) >= EMAIL_WORKERS:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch_sent, batch_failed = future.result()
+                        sent_count += batch_sent
+                        failed_count += len(batch_failed)
+                        failed_emails.extend(batch_failed[:MAX_REPORTED_FAILURES - len(failed_emails)])
                 
-                failed_emails.append({
-                    "email": email,
-                    "error": error_details
-                })
-
-        if failed_emails:
-            logger.warning(f"⚠️ {len(failed_emails)} emails failed to send")
-            error_summary = f"Sent {sent_count}/{len(contacts)} emails"
-            send_error_notification(
-                "Partial Email Failure",
-                error_summary,
-                f"Failed emails: {failed_emails}"
-            )
-            return False, f"{error_summary}. Failures: {failed_emails}", sent_count
+                total_contacts += len(batch)
+                pending.add(executor.submit(_send_batch, batch, html_parts, base_payload))
+            
+            for future in wait(pending).done:
+                batch_sent, batch_failed = future.result()
+                sent_count += batch_sent
+                failed_count += len(batch_failed)
+                failed_emails.extend(batch_failed[:MAX_REPORTED_FAILURES - len(failed_emails)])
 
-        logger.info(f"✅ All {sent_count} emails sent successfully!")
+        if failed_count or stream_error or sample_only:
+            if failed_count:
+                logger.warning("⚠️ %s emails failed to send", failed_count)
+            error_summary = f"Sent {sent_count}/{total_contacts} emails"
+            if sample_only:
+                error_summary += " - contact export unavailable, only a sample from the contacts API was mailed"
+            if stream_error:
+                error_summary += f" before the contact export stream failed: {stream_error}"
+            if failed_count > len(failed_emails):
+                error_summary += f" (showing first {len(failed_emails)} of {failed_count} failures)"
+            if failed_emails:
+                send_error_notification("Partial Email Failure", error_summary, f"Failed emails: {failed_emails}")
+                return False, f"{error_summary}. Failures: {failed_emails}", sent_count
+            
+            send_error_notification("Partial Email Failure", error_summary)
+            return False, error_summary, sent_count
+
+        logger.info("✅ All %s emails sent successfully!", sent_count)
         
         send_error_notification(
             "Email Sent Successfully",
@@ -946,8 +1481,8 @@ def send_emails_with_subject(subject_prefix="📊 Daily Forex Signals - Forex_Bu
         
     except Exception as e:
         error_msg = f"Critical error during email sending: {str(e)}"
-        error_trace = traceback.format_exc()
-        logger.exception(f"❌ {error_msg}")
+        error_trace = traceback.format_exc() if ALERT_EMAIL else None
+        logger.exception("❌ %s", error_msg)
         send_error_notification("Critical Error", error_msg, error_trace)
         return False, error_msg, 0
 
@@ -957,34 +1492,37 @@ def send_emails_with_subject(subject_prefix="📊 Daily Forex Signals - Forex_Bu
 
 def scheduled_daily_email_job():
     """Daily email job - runs at configured time in UAE timezone"""
+    global last_execution_at
     try:
-        now_uae = datetime.now(UAE_TZ)
-        logger.info(f"⏰ [{now_uae.strftime('%Y-%m-%d %H:%M:%S %Z')}] Starting scheduled daily email job...")
+        started_at = uae_timestamp()
+        logger.info(f"⏰ [{started_at}] Starting scheduled daily email job...")
         
-        last_execution["timestamp"] = now_uae.strftime('%Y-%m-%d %H:%M:%S %Z')
+        last_execution["timestamp"] = started_at
+        last_execution_at = datetime.now(UAE_TZ)
         last_execution["status"] = "Running"
         
-        with app.app_context():
-            success, message, count = send_emails_with_subject("📊 Daily Forex Signals - Forex_Bullion")
-            
-            last_execution["status"] = "Success" if success else "Failed"
-            last_execution["message"] = message
-            last_execution["emails_sent"] = count
-            last_execution["error"] = None if success else message
-            
-            if success:
-                logger.info(f"✅ Daily emails sent successfully: {message}")
-            else:
-                logger.error(f"❌ Daily email job failed: {message}")
+        # No Flask globals are used by the send path, so no app context is pushed
+        success, message, count = send_emails_with_subject("📊 Daily Forex Signals - Forex_Bullion")
+        
+        last_execution["status"] = "Success" if success else "Failed"
+        last_execution["message"] = message
+        last_execution["emails_sent"] = count
+        last_execution["error"] = None if success else message
+        
+        if success:
+            logger.info(f"✅ Daily emails sent successfully: {message}")
+        else:
+            logger.error(f"❌ Daily email job failed: {message}")
         
     except Exception as e:
         error_msg = f"Scheduler job exception: {str(e)}"
-        error_trace = traceback.format_exc()
+        error_trace = traceback.format_exc() if ALERT_EMAIL else None
         logger.exception(f"❌ {error_msg}")
         
         last_execution["status"] = "Error"
         last_execution["error"] = error_msg
-        last_execution["timestamp"] = datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')
+        last_execution["timestamp"] = uae_timestamp()
+        last_execution_at = datetime.now(UAE_TZ)
         
         send_error_notification("Scheduler Exception", error_msg, error_trace)
 
@@ -992,7 +1530,17 @@ def scheduled_daily_email_job():
 # SCHEDULER SETUP
 # ===========================
 
-scheduler = BackgroundScheduler(timezone=UAE_TZ)
+# Sends block their worker thread for a while, so a run that starts late (busy
+# pool, slow boot) still goes out instead of being dropped after APScheduler's
+# default 1s grace period, and missed runs collapse into one instead of piling up
+scheduler = BackgroundScheduler(
+    timezone=UAE_TZ,
+    job_defaults={
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": 300
+    }
+)
 
 def reschedule_daily_job(hour, minute):
     """Reschedule the daily email job with new time"""
@@ -1017,80 +1565,98 @@ def reschedule_daily_job(hour, minute):
         logger.error(f"❌ Error rescheduling job: {e}")
         raise
 
-load_schedule_config()
-
-scheduler.add_job(
-    scheduled_daily_email_job,
-    trigger='cron',
-    hour=schedule_config['hour'],
-    minute=schedule_config['minute'],
-    id='daily_emails',
-    name='Daily Email Job',
-    replace_existing=True
-)
-
-if ENABLE_MONITORING:
+def start_scheduler():
+    """Load the saved schedule, register the jobs and start the scheduler"""
+    load_schedule_config()
+    
     scheduler.add_job(
-        scheduled_monitoring_job,
-        trigger='interval',
-        hours=MONITORING_INTERVAL_HOURS,
-        id='health_monitoring',
-        name='Health Monitoring Job',
+        scheduled_daily_email_job,
+        trigger='cron',
+        hour=schedule_config['hour'],
+        minute=schedule_config['minute'],
+        id='daily_emails',
+        name='Daily Email Job',
         replace_existing=True
     )
-    logger.info(f"📊 Monitoring job scheduled every {MONITORING_INTERVAL_HOURS} hours")
-
-scheduler.start()
-logger.info("📅 Email scheduler started successfully")
-logger.info(f"  - Daily emails: Every day at {schedule_config['hour']:02d}:{schedule_config['minute']:02d} UAE time")
-if ENABLE_MONITORING:
-    logger.info(f"  - Health monitoring: Every {MONITORING_INTERVAL_HOURS} hours")
+    
+    if ENABLE_MONITORING:
+        scheduler.add_job(
+            scheduled_monitoring_job,
+            trigger='interval',
+            hours=MONITORING_INTERVAL_HOURS,
+            id='health_monitoring',
+            name='Health Monitoring Job',
+            replace_existing=True
+        )
+        logger.info(f"📊 Monitoring job scheduled every {MONITORING_INTERVAL_HOURS} hours")
+    
+    # gunicorn_conf.py keeps a single worker, so this process owns the only scheduler
+    scheduler.start()
+    logger.info("📅 Email scheduler started successfully")
+    logger.info(f"  - Daily emails: Every day at {schedule_config['hour']:02d}:{schedule_config['minute']:02d} UAE time")
+    if ENABLE_MONITORING:
+        logger.info(f"  - Health monitoring: Every {MONITORING_INTERVAL_HOURS} hours")
+    
+    atexit.register(lambda: scheduler.shutdown())
 
-atexit.register(lambda: scheduler.shutdown())
+# Off only for tests and tooling that import this module without running jobs
+if START_SCHEDULER:
+    start_scheduler()
 
 # ===========================
 # MAIN
 # ===========================
 
 if __name__ == '__main__':
-    print("\n" + "="*60)
-    print("📅 EMAIL SCHEDULER STARTED")
-    print("="*60)
-    print(f"Environment: {ENVIRONMENT}")
-    print(f"Schedule: Daily at {schedule_config['hour']:02d}:{schedule_config['minute']:02d} UAE time")
-    print(f"Monitoring: {'Enabled' if ENABLE_MONITORING else 'Disabled'}")
-    if ENABLE_MONITORING:
-        print(f"Monitoring Interval: Every {MONITORING_INTERVAL_HOURS} hours")
-    print(f"Current time: {datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')}")
-    print("\n🌐 Available endpoints:")
-    print("  - Home:            GET  /")
-    print("  - CORS Test:       GET  /cors-test")
-    print("  - Health:          GET  /health")
-    print("  - Status:          GET  /status")
-    print("  - Get schedule:    GET  /get-schedule")
-    print("  - Update schedule: POST /update-schedule")
-    print("  - Check sender:    GET  /check-sender")
-    print("  - Last execution:  GET  /last-execution")
-    print("  - Manual trigger:  POST /trigger-test (requires X-API-Key header)")
-    if ENABLE_MONITORING:
-        print("  - Manual monitor:  POST /monitor")
-        print("  - Monitor report:  GET  /monitoring-report")
-    print("\n📧 Configuration:")
-    print(f"  - Sender: {SENDER_EMAIL}")
-    print(f"  - Alert Email: {ALERT_EMAIL if ALERT_EMAIL else 'Not configured'}")
-    print(f"  - Template: {TEMPLATE_PATH}")
-    print(f"\n🔒 CORS Configuration:")
-    print(f"  - Enabled: Yes")
-    print(f"  - Allowed Origins: {len(ALLOWED_ORIGINS)}")
-    for origin in ALLOWED_ORIGINS:
-        print(f"    • {origin}")
-    print("="*60 + "\n")
+    started_at = uae_timestamp()
+    port = int(os.getenv('PORT', 5000))
+    
+    logger.info(
+        "📅 Email scheduler starting: env=%s schedule=%02d:%02d UAE monitoring=%s port=%s",
+        ENVIRONMENT, schedule_config['hour'], schedule_config['minute'],
+        'enabled' if ENABLE_MONITORING else 'disabled', port
+    )
+    
+    if VERBOSE_BANNER:
+        print("\n" + "="*60)
+        print("📅 EMAIL SCHEDULER STARTED")
+        print("="*60)
+        print(f"Environment: {ENVIRONMENT}")
+        print(f"Schedule: Daily at {schedule_config['hour']:02d}:{schedule_config['minute']:02d} UAE time")
+        print(f"Monitoring: {'Enabled' if ENABLE_MONITORING else 'Disabled'}")
+        if ENABLE_MONITORING:
+            print(f"Monitoring Interval: Every {MONITORING_INTERVAL_HOURS} hours")
+        print(f"Current time: {started_at}")
+        print("\n🌐 Available endpoints:")
+        print("  - Home:            GET  /")
+        print("  - CORS Test:       GET  /cors-test")
+        print("  - Health:          GET  /health")
+        print("  - Status:          GET  /status")
+        print("  - Get schedule:    GET  /get-schedule")
+        print("  - Update schedule: POST /update-schedule")
+        print("  - Check sender:    GET  /check-sender (?refresh=1 bypasses the cache)")
+        print("  - Last execution:  GET  /last-execution")
+        print("  - Manual trigger:  POST /trigger-test (requires X-API-Key header)")
+        print("  - Last test send:  GET  /last-test-send")
+        if ENABLE_MONITORING:
+            print("  - Manual monitor:  POST /monitor")
+            print("  - Monitor report:  GET  /monitoring-report")
+        print("\n📧 Configuration:")
+        print(f"  - Sender: {SENDER_EMAIL}")
+        print(f"  - Alert Email: {ALERT_EMAIL if ALERT_EMAIL else 'Not configured'}")
+        print(f"  - Template: {TEMPLATE_PATH}")
+        print(f"\n🔒 CORS Configuration:")
+        print(f"  - Enabled: Yes")
+        print(f"  - Allowed Origins: {len(ALLOWED_ORIGINS)}")
+        for origin in ALLOWED_ORIGINS:
+            print(f"    • {origin}")
+        print("="*60 + "\n")
     
     try:
         if ALERT_EMAIL:
             send_error_notification(
                 "API Started",
-                f"Email API has been started successfully at {datetime.now(UAE_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')}",
+                f"Email API has been started successfully at {started_at}",
                 f"Environment: {ENVIRONMENT}\nSchedule: Daily at {schedule_config['hour']:02d}:{schedule_config['minute']:02d} UAE time\nMonitoring: {'Enabled' if ENABLE_MONITORING else 'Disabled'}\nCORS: Enabled"
             )
     except Exception as e:
@@ -1103,7 +1669,6 @@ if __name__ == '__main__':
         except Exception as e:
             logger.warning(f"Could not run initial health check: {e}")
     
-    port = int(os.getenv('PORT', 5000))
     debug_mode = ENVIRONMENT == 'development'
     
     app.run(
@@ -0,0 +1,16 @@
+"""Imports main for the tests without starting its scheduler or touching the repo's schedule file"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+_config_dir = tempfile.mkdtemp(prefix="email-api-tests-")
+atexit.register(shutil.rmtree, _config_dir, ignore_errors=True)
+
+os.environ["START_SCHEDULER"] = "false"
+os.environ["SCHEDULE_CONFIG_FILE"] = os.path.join(_config_dir, "schedule_config.json")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
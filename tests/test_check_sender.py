@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+
+from support import main
+
+
+def _senders_response(verified):
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {"results": [{"from_email": "sender@example.com", "verified": verified}]}
+    return response
+
+
+class CheckSenderTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = main.app.test_client()
+        patches = [
+            mock.patch.object(main, "SENDGRID_API_KEY", "SG.test"),
+            mock.patch.object(main, "SENDER_EMAIL", "sender@example.com"),
+            mock.patch.object(main, "verified_senders_cache", None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_refresh_bypasses_the_cached_sender_list(self):
+        responses = [_senders_response(False), _senders_response(True)]
+        with mock.patch.object(main.SENDGRID_SESSION, "get", side_effect=responses) as get:
+            self.assertFalse(self.client.get("/check-sender").get_json()["is_verified"])
+            self.assertFalse(self.client.get("/check-sender").get_json()["is_verified"])
+            self.assertTrue(self.client.get("/check-sender?refresh=1").get_json()["is_verified"])
+        self.assertEqual(get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+from support import main
+
+
+class CorsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = main.app.test_client()
+    
+    def test_whitelisted_origin_gets_credentialed_cors(self):
+        response = self.client.get("/get-schedule", headers={"Origin": "https://quantopick.com"})
+        self.assertEqual(response.headers.get("Access-Control-Allow-Origin"), "https://quantopick.com")
+        self.assertEqual(response.headers.get("Access-Control-Allow-Credentials"), "true")
+    
+    def test_other_origins_get_no_cors_headers(self):
+        with self.assertLogs(main.logger, "WARNING"):
+            response = self.client.options("/update-schedule", headers={
+                "Origin": "https://evil.example",
+                "Access-Control-Request-Method": "POST",
+            })
+        self.assertNotIn("Access-Control-Allow-Origin", response.headers)
+        self.assertNotIn("Access-Control-Allow-Credentials", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
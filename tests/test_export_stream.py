@@ -0,0 +1,78 @@
+import gzip
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from support import main
+
+
+CSV_HEADER = "EMAIL,FIRST_NAME,LAST_NAME\r\n"
+
+
+class _ExportFileHandler(BaseHTTPRequestHandler):
+    """Serves the export files registered in FILES, chunked like a real download"""
+    
+    FILES = {}
+    
+    def do_GET(self):
+        body = self.FILES[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(body), 4096):
+            chunk = body[start:start + 4096]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class IterExportedContactsTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _ExportFileHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def _serve(self, path, body):
+        _ExportFileHandler.FILES[path] = body
+        return self.base_url + path
+    
+    def _rows(self, count):
+        rows = [CSV_HEADER] + [f"user{i}@example.com,Name{i},Last\r\n" for i in range(count)]
+        expected = [(f"user{i}@example.com", f"Name{i}") for i in range(count)]
+        return "".join(rows).encode("utf-8"), expected
+    
+    def test_plain_csv(self):
+        for count in (3, 5000):
+            body, expected = self._rows(count)
+            url = self._serve(f"/plain-{count}.csv", body)
+            self.assertEqual(list(main._iter_exported_contacts([url])), expected)
+    
+    def test_gzip_csv(self):
+        for count in (3, 5000):
+            body, expected = self._rows(count)
+            url = self._serve(f"/gzip-{count}.csv.gz", gzip.compress(body))
+            self.assertEqual(list(main._iter_exported_contacts([url])), expected)
+    
+    def test_missing_first_name_defaults_to_trader(self):
+        url = self._serve("/no-name.csv", b"\xef\xbb\xbfEMAIL\r\na@example.com\r\n\r\n")
+        self.assertEqual(list(main._iter_exported_contacts([url])), [("a@example.com", "Trader")])
+    
+    def test_multiple_files_are_chained(self):
+        first, first_expected = self._rows(2)
+        second = CSV_HEADER.encode() + b"b@example.com,Bee,Last\r\n"
+        urls = [self._serve("/part-1.csv", first), self._serve("/part-2.csv.gz", gzip.compress(second))]
+        self.assertEqual(list(main._iter_exported_contacts(urls)), first_expected + [("b@example.com", "Bee")])
+
+
+if __name__ == "__main__":
+    unittest.main()
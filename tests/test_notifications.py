@@ -0,0 +1,49 @@
+import threading
+import unittest
+from unittest import mock
+
+from support import main
+
+
+class SendErrorNotificationTest(unittest.TestCase):
+    
+    def setUp(self):
+        patches = [
+            mock.patch.object(main, "ALERT_EMAIL", "alerts@example.com"),
+            mock.patch.object(main, "SENDGRID_API_KEY", "SG.test"),
+            mock.patch.object(main, "SENDER_EMAIL", "sender@example.com"),
+            mock.patch.object(main, "_post_mail", return_value=mock.Mock(status_code=202)),
+            mock.patch.dict(main.last_notification_at, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def _drain(self):
+        main.notification_executor.submit(lambda: None).result()
+    
+    def test_repeats_of_the_same_type_are_collapsed(self):
+        self.assertTrue(main.send_error_notification("Critical Error", "first"))
+        self.assertFalse(main.send_error_notification("Critical Error", "second"))
+        self.assertTrue(main.send_error_notification("Template Error", "other type"))
+        self._drain()
+        self.assertEqual(main._post_mail.call_count, 2)
+    
+    def test_full_queue_drops_the_oldest_pending_alert(self):
+        release = threading.Event()
+        main.notification_executor.submit(release.wait)
+        try:
+            for i in range(main.MAX_PENDING_NOTIFICATIONS + 3):
+                main.send_error_notification(f"Alert {i}", "boom")
+        finally:
+            release.set()
+        self._drain()
+        
+        subjects = [call.args[0]["subject"] for call in main._post_mail.call_args_list]
+        self.assertEqual(len(subjects), main.MAX_PENDING_NOTIFICATIONS)
+        self.assertIn(f"Alert {main.MAX_PENDING_NOTIFICATIONS + 2}", subjects[-1])
+        self.assertNotIn("Alert 0 ", " ".join(subjects))
+
+
+if __name__ == "__main__":
+    unittest.main()
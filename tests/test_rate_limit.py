@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from support import main
+
+
+class TokenBucketTest(unittest.TestCase):
+    
+    def test_rate_below_one_per_second_still_allows_calls(self):
+        bucket = main.TokenBucket(0.5)
+        with mock.patch.object(main.time, "sleep") as sleep:
+            bucket.acquire()
+            sleep.assert_not_called()
+    
+    def test_non_positive_rate_is_rejected(self):
+        for rate in (0, -1):
+            with self.assertRaises(ValueError):
+                main.TokenBucket(rate)
+
+    
+    def test_non_numeric_env_rate_falls_back_to_default(self):
+        env = {**os.environ, "MAIL_SEND_RATE_PER_SECOND": "fast"}
+        result = subprocess.run(
+            [sys.executable, "-c", "import main; print(main.mail_send_bucket.rate)"],
+            cwd=os.path.dirname(os.path.abspath(main.__file__)),
+            env=env, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "50.0")
+        self.assertIn("Invalid MAIL_SEND_RATE_PER_SECOND=fast", result.stderr)
+
+class RetryWaitSecondsTest(unittest.TestCase):
+    
+    def test_retry_after_is_capped(self):
+        response = mock.Mock(headers={"Retry-After": "86400"})
+        self.assertEqual(main._retry_wait_seconds(response, 0), 60)
+    
+    def test_retry_after_is_honoured(self):
+        response = mock.Mock(headers={"Retry-After": "7"})
+        self.assertEqual(main._retry_wait_seconds(response, 0), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import orjson
+
+from support import main
+
+
+class SaveScheduleConfigTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.config_file = os.path.join(self.tmp_dir.name, "schedule_config.json")
+        for patch in (
+            mock.patch.object(main, "CONFIG_FILE", self.config_file),
+            mock.patch.object(main, "schedule_config", {"hour": 10, "minute": 0}),
+            mock.patch.object(main, "saved_schedule_config", None),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_concurrent_saves_leave_a_complete_file(self):
+        def save(minute):
+            main.schedule_config["minute"] = minute
+            main.save_schedule_config()
+        
+        threads = [threading.Thread(target=save, args=(minute,)) for minute in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        with open(self.config_file, 'rb') as f:
+            self.assertEqual(set(orjson.loads(f.read())), {"hour", "minute"})
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["schedule_config.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
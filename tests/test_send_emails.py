@@ -0,0 +1,97 @@
+import os
+import unittest
+from unittest import mock
+
+import requests
+
+from support import main
+
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "template.html")
+
+
+def _contacts(count, error=None):
+    for i in range(count):
+        yield f"user{i}@example.com", f"Name{i}"
+    if error is not None:
+        raise error
+
+
+class SendEmailsStreamErrorTest(unittest.TestCase):
+    
+    def setUp(self):
+        patches = [
+            mock.patch.object(main, "SENDGRID_API_KEY", "SG.test"),
+            mock.patch.object(main, "SENDER_EMAIL", "sender@example.com"),
+            mock.patch.object(main, "TEMPLATE_PATH", TEMPLATE_PATH),
+            mock.patch.object(main, "send_error_notification"),
+            mock.patch.object(main, "_post_mail", return_value=mock.Mock(status_code=202)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_unreadable_export_falls_back_to_contacts_api(self):
+        sample = mock.Mock(status_code=200)
+        sample.json.return_value = {"result": [
+            {"email": "a@example.com", "first_name": "Ann"},
+            {"email": None, "first_name": "Nobody"},
+        ]}
+        
+        with mock.patch.object(main, "_export_contacts", return_value=_contacts(0, ValueError("closed file"))), \
+                mock.patch.object(main, "_fetch_contacts_sample", return_value=sample):
+            success, message, sent_count = main.send_emails_with_subject("Test")
+        
+        # Only a sample was mailed, so the run is reported as degraded rather than successful
+        self.assertFalse(success)
+        self.assertIn("only a sample", message)
+        self.assertEqual(sent_count, 1)
+        self.assertEqual(main.send_error_notification.call_args[0][0], "Partial Email Failure")
+        personalizations = main._post_mail.call_args[0][0]["personalizations"]
+        self.assertEqual([p["to"][0]["email"] for p in personalizations], ["a@example.com"])
+    
+    def test_mid_stream_failure_reports_batches_already_sent(self):
+        contacts = _contacts(main.MAX_PERSONALIZATIONS + 5, ValueError("connection reset"))
+        
+        with mock.patch.object(main, "_export_contacts", return_value=contacts):
+            success, message, sent_count = main.send_emails_with_subject("Test")
+        
+        self.assertFalse(success)
+        self.assertEqual(sent_count, main.MAX_PERSONALIZATIONS)
+        self.assertIn("connection reset", message)
+        self.assertEqual(main._post_mail.call_count, 1)
+
+
+def _http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{"errors": []}'
+    return requests.HTTPError(str(status_code), response=response)
+
+
+class SendBatchFallbackTest(unittest.TestCase):
+    
+    batch = [("a@example.com", "Ann"), ("b@example.com", "Bob")]
+    html_parts = ["Hi ", "!"]
+    
+    def test_rejected_batch_is_retried_per_contact(self):
+        responses = [_http_error(400), mock.Mock(status_code=202), mock.Mock(status_code=202)]
+        
+        with mock.patch.object(main, "_post_mail", side_effect=responses) as post_mail:
+            sent_count, failed = main._send_batch(self.batch, self.html_parts, {})
+        
+        self.assertEqual((sent_count, failed), (2, []))
+        self.assertEqual(post_mail.call_count, 3)
+    
+    def test_other_errors_fail_the_batch_without_resending(self):
+        for error in (_http_error(500), _http_error(429), requests.ReadTimeout("timed out")):
+            with mock.patch.object(main, "_post_mail", side_effect=error) as post_mail:
+                sent_count, failed = main._send_batch(self.batch, self.html_parts, {})
+            
+            self.assertEqual(sent_count, 0)
+            self.assertEqual([failure["email"] for failure in failed], ["a@example.com", "b@example.com"])
+            self.assertEqual(post_mail.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
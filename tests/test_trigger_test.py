@@ -0,0 +1,34 @@
+import os
+import unittest
+from unittest import mock
+
+from support import main
+
+
+class TriggerTestRouteTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.client = main.app.test_client()
+        self.headers = {"X-API-Key": os.getenv('MANUAL_TRIGGER_KEY', 'test-key-12345')}
+    
+    def test_result_is_reported_by_last_test_send(self):
+        result = (True, "Emails sent to 3 contacts", 3)
+        with mock.patch.object(main, "send_emails_with_subject", return_value=result):
+            response = self.client.post("/trigger-test", headers=self.headers)
+            self.assertEqual(response.status_code, 202)
+            main.manual_send_future.result()
+        
+        last_test_send = self.client.get("/last-test-send").get_json()["last_test_send"]
+        self.assertEqual(last_test_send["status"], "Success")
+        self.assertEqual(last_test_send["emails_sent"], 3)
+        self.assertEqual(last_test_send["message"], "Emails sent to 3 contacts")
+    
+    def test_second_trigger_while_running_is_rejected(self):
+        running = mock.Mock(done=mock.Mock(return_value=False))
+        with mock.patch.object(main, "manual_send_future", running):
+            response = self.client.post("/trigger-test", headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()